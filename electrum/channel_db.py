@@ -28,8 +28,9 @@ import random
 import os
 from collections import defaultdict
 from typing import Sequence, List, Tuple, Optional, Dict, NamedTuple, TYPE_CHECKING, Set
-import binascii
 import base64
+import socket
+import ipaddress
 import asyncio
 import threading
 from enum import IntEnum
@@ -39,7 +40,7 @@ from aiorpcx import NetAddress
 
 from .sql_db import SqlDB, sql
 from . import constants, util
-from .util import profiler, get_headers_dir, is_ip_address, json_normalize, UserFacingException
+from .util import profiler, get_headers_dir, json_normalize, UserFacingException
 from .logging import Logger
 from .lnutil import (LNPeerAddr, format_short_channel_id, ShortChannelID,
                      validate_features, IncompatibleOrInsaneFeatures, InvalidGossipMsg)
@@ -159,6 +160,15 @@ class Policy(NamedTuple):
         return self.key[8:]
 
 
+# address descriptor type -> length of the address (excluding the 2-byte port), see BOLT-07
+_NODE_ADDRESS_TYPE_LEN = {
+    1: 4,   # IPv4
+    2: 16,  # IPv6
+    3: 10,  # Tor v2 onion service
+    4: 35,  # Tor v3 onion service
+}
+
+
 class NodeInfo(NamedTuple):
     node_id: bytes
     features: int
@@ -192,43 +202,37 @@ class NodeInfo(NamedTuple):
         return NodeInfo.from_msg(payload_dict)
 
     @staticmethod
-    def parse_addresses_field(addresses_field):
+    def parse_addresses_field(addresses_field: bytes) -> List[Tuple[str, int]]:
         buf = addresses_field
-        def read(n):
-            nonlocal buf
-            data, buf = buf[0:n], buf[n:]
-            return data
+        pos = 0
         addresses = []
-        while buf:
-            atype = ord(read(1))
+        while pos < len(buf):
+            atype = buf[pos]
+            pos += 1
             if atype == 0:
-                pass
-            elif atype == 1:  # IPv4
-                ipv4_addr = '.'.join(map(lambda x: '%d' % x, read(4)))
-                port = int.from_bytes(read(2), 'big')
-                if is_ip_address(ipv4_addr) and port != 0:
-                    addresses.append((ipv4_addr, port))
-            elif atype == 2:  # IPv6
-                ipv6_addr = b':'.join([binascii.hexlify(read(2)) for i in range(8)])
-                ipv6_addr = ipv6_addr.decode('ascii')
-                port = int.from_bytes(read(2), 'big')
-                if is_ip_address(ipv6_addr) and port != 0:
-                    addresses.append((ipv6_addr, port))
-            elif atype == 3:  # onion v2
-                host = base64.b32encode(read(10)) + b'.onion'
-                host = host.decode('ascii').lower()
-                port = int.from_bytes(read(2), 'big')
-                addresses.append((host, port))
-            elif atype == 4:  # onion v3
-                host = base64.b32encode(read(35)) + b'.onion'
-                host = host.decode('ascii').lower()
-                port = int.from_bytes(read(2), 'big')
-                addresses.append((host, port))
-            else:
+                continue
+            addr_len = _NODE_ADDRESS_TYPE_LEN.get(atype)
+            if addr_len is None:
                 # unknown address type
                 # we don't know how long it is -> have to escape
                 # if there are other addresses we could have parsed later, they are lost.
                 break
+            if pos + addr_len + 2 > len(buf):
+                break  # truncated
+            raw_addr = buf[pos:pos + addr_len]
+            port = int.from_bytes(buf[pos + addr_len:pos + addr_len + 2], 'big')
+            pos += addr_len + 2
+            if atype == 1:  # IPv4
+                if port != 0:
+                    addresses.append((socket.inet_ntop(socket.AF_INET, raw_addr), port))
+            elif atype == 2:  # IPv6
+                if port != 0:
+                    # keep the exploded form: stored hosts are part of the address table's primary key
+                    addresses.append((ipaddress.IPv6Address(raw_addr).exploded, port))
+            else:  # onion v2 / v3
+                host = base64.b32encode(raw_addr) + b'.onion'
+                host = host.decode('ascii').lower()
+                addresses.append((host, port))
         return addresses
 
 
@@ -74,6 +74,8 @@ try:
     from cryptography.hazmat.primitives.ciphers import algorithms as CG_algorithms
     from cryptography.hazmat.primitives.ciphers import modes as CG_modes
     from cryptography.hazmat.backends import default_backend as CG_default_backend
+    from cryptography.hazmat.primitives import hashes as CG_hashes
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDF as CG_HKDF
     import cryptography.hazmat.primitives.ciphers.aead as CG_aead
 except Exception:
     pass
@@ -327,8 +329,7 @@ def sha256(x: Union[bytes, str]) -> bytes:
 
 def sha256d(x: Union[bytes, str]) -> bytes:
     x = to_bytes(x, 'utf8')
-    out = bytes(sha256(sha256(x)))
-    return out
+    return hashlib.sha256(hashlib.sha256(x).digest()).digest()
 
 
 def hash_160(x: bytes) -> bytes:
@@ -349,11 +350,26 @@ def ripemd(x: bytes) -> bytes:
         return md.digest()
 
 def hmac_oneshot(key: bytes, msg: bytes, digest) -> bytes:
-    if hasattr(hmac, 'digest'):
-        # requires python 3.7+; faster
-        return hmac.digest(key, msg, digest)
-    else:
-        return hmac.new(key, msg, digest).digest()
+    return hmac.digest(key, msg, digest)
+
+
+def hkdf_sha256(*, salt: bytes, ikm: bytes, info: bytes = b"", length: int) -> bytes:
+    """RFC5869 HKDF (extract and expand) using HMAC-SHA256."""
+    assert 0 < length <= 255 * 32, f"unexpected output length: {length}"
+    if HAS_CRYPTOGRAPHY:
+        # runs the whole extract+expand in OpenSSL
+        hkdf = CG_HKDF(algorithm=CG_hashes.SHA256(), length=length, salt=salt, info=info,
+                       backend=CG_default_backend())
+        return hkdf.derive(ikm)
+    prk = hmac_oneshot(salt, ikm, hashlib.sha256)
+    okm = b""
+    t = b""
+    i = 1
+    while len(okm) < length:
+        t = hmac_oneshot(prk, t + info + bytes([i]), hashlib.sha256)
+        okm += t
+        i += 1
+    return okm[:length]
 
 
 def chacha20_poly1305_encrypt(
@@ -369,15 +385,16 @@ def chacha20_poly1305_encrypt(
     assert isinstance(data, (bytes, bytearray))
     assert len(key) == 32, f"unexpected key size: {len(key)} (expected: 32)"
     assert len(nonce) == 12, f"unexpected nonce size: {len(nonce)} (expected: 12)"
+    # prefer cryptography: a single call into OpenSSL's EVP_chacha20_poly1305
+    if HAS_CRYPTOGRAPHY:
+        a = CG_aead.ChaCha20Poly1305(bytes(key))
+        return a.encrypt(nonce, data, associated_data)
     if HAS_CRYPTODOME:
         cipher = CD_ChaCha20_Poly1305.new(key=key, nonce=nonce)
         if associated_data is not None:
             cipher.update(associated_data)
         ciphertext, mac = cipher.encrypt_and_digest(plaintext=data)
         return ciphertext + mac
-    if HAS_CRYPTOGRAPHY:
-        a = CG_aead.ChaCha20Poly1305(key)
-        return a.encrypt(nonce, data, associated_data)
     raise Exception("no chacha20 backend found")
 
 
@@ -394,19 +411,51 @@ def chacha20_poly1305_decrypt(
     assert isinstance(data, (bytes, bytearray))
     assert len(key) == 32, f"unexpected key size: {len(key)} (expected: 32)"
     assert len(nonce) == 12, f"unexpected nonce size: {len(nonce)} (expected: 12)"
+    if HAS_CRYPTOGRAPHY:  # see note in chacha20_poly1305_encrypt
+        a = CG_aead.ChaCha20Poly1305(bytes(key))
+        try:
+            return a.decrypt(nonce, data, associated_data)
+        except cryptography.exceptions.InvalidTag as e:
+            raise ValueError("invalid tag") from e
     if HAS_CRYPTODOME:
         cipher = CD_ChaCha20_Poly1305.new(key=key, nonce=nonce)
         if associated_data is not None:
             cipher.update(associated_data)
         # raises ValueError if not valid (e.g. incorrect MAC)
         return cipher.decrypt_and_verify(ciphertext=data[:-16], received_mac_tag=data[-16:])
-    if HAS_CRYPTOGRAPHY:
-        a = CG_aead.ChaCha20Poly1305(key)
+    raise Exception("no chacha20 backend found")
+
+
+class ChaCha20Poly1305:
+    """ChaCha20-Poly1305 AEAD bound to a single key.
+
+    Same as chacha20_poly1305_encrypt/decrypt, but with the cryptography backend
+    the cipher object is set up once and reused for every nonce under this key.
+    The key is forgotten together with this object.
+    """
+
+    def __init__(self, key: bytes):
+        assert isinstance(key, (bytes, bytearray))
+        assert len(key) == 32, f"unexpected key size: {len(key)} (expected: 32)"
+        self._key = bytes(key)
+        self._cg_aead = CG_aead.ChaCha20Poly1305(self._key) if HAS_CRYPTOGRAPHY else None
+
+    def encrypt(self, *, nonce: bytes, associated_data: bytes = None, data: bytes) -> bytes:
+        if self._cg_aead is None:
+            return chacha20_poly1305_encrypt(
+                key=self._key, nonce=nonce, associated_data=associated_data, data=data)
+        assert len(nonce) == 12, f"unexpected nonce size: {len(nonce)} (expected: 12)"
+        return self._cg_aead.encrypt(nonce, data, associated_data)
+
+    def decrypt(self, *, nonce: bytes, associated_data: bytes = None, data: bytes) -> bytes:
+        if self._cg_aead is None:
+            return chacha20_poly1305_decrypt(
+                key=self._key, nonce=nonce, associated_data=associated_data, data=data)
+        assert len(nonce) == 12, f"unexpected nonce size: {len(nonce)} (expected: 12)"
         try:
-            return a.decrypt(nonce, data, associated_data)
+            return self._cg_aead.decrypt(nonce, data, associated_data)
         except cryptography.exceptions.InvalidTag as e:
             raise ValueError("invalid tag") from e
-    raise Exception("no chacha20 backend found")
 
 
 def chacha20_encrypt(*, key: bytes, nonce: bytes, data: bytes) -> bytes:
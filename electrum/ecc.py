@@ -421,6 +421,28 @@ CURVE_ORDER = 0xFFFFFFFF_FFFFFFFF_FFFFFFFF_FFFFFFFE_BAAEDCE6_AF48A03B_BFD25E8C_D
 POINT_AT_INFINITY = ECPubkey(None)
 
 
+def ecdh_sha256(privkey_bytes: bytes, pubkey_bytes: bytes) -> bytes:
+    """Returns sha256 of the compressed shared point privkey*pubkey
+    (the default hash of libsecp256k1's ecdh module, as used by BOLT-04 and BOLT-08).
+    """
+    if ecc_fast.HAS_ECDH and len(privkey_bytes) == 32 and is_secret_within_curve_range(privkey_bytes):
+        assert_bytes(pubkey_bytes)
+        pubkey_ptr = create_string_buffer(64)
+        ret = _libsecp256k1.secp256k1_ec_pubkey_parse(
+            _libsecp256k1.ctx, pubkey_ptr, bytes(pubkey_bytes), len(pubkey_bytes))
+        if 1 != ret:
+            raise InvalidECPointException(
+                f'public key could not be parsed or is invalid: {pubkey_bytes.hex()!r}')
+        output = create_string_buffer(32)
+        ret = _libsecp256k1.secp256k1_ecdh(
+            _libsecp256k1.ctx, output, pubkey_ptr, bytes(privkey_bytes), None, None)
+        if 1 != ret:
+            raise Exception('secp256k1_ecdh failed')
+        return bytes(output)
+    pt = ECPubkey(pubkey_bytes) * string_to_number(privkey_bytes)
+    return sha256(pt.get_public_key_bytes(compressed=True))
+
+
 def usermessage_magic(message: bytes) -> bytes:
     from .bitcoin import var_int
     length = var_int(len(message))
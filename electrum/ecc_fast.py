@@ -42,7 +42,7 @@ class LibModuleMissing(Exception): pass
 
 
 def load_library():
-    global HAS_SCHNORR
+    global HAS_SCHNORR, HAS_ECDH
 
     # note: for a mapping between bitcoin-core/secp256k1 git tags and .so.V libtool version numbers,
     #       see https://github.com/bitcoin-core/secp256k1/pull/1055#issuecomment-1227505189
@@ -163,6 +163,14 @@ def load_library():
             # raise LibModuleMissing('libsecp256k1 library found but it was built '
             #                        'without required module (--enable-module-extrakeys)')
 
+        # --enable-module-ecdh
+        try:
+            secp256k1.secp256k1_ecdh.argtypes = [c_void_p, c_char_p, c_char_p, c_char_p, c_void_p, c_void_p]
+            secp256k1.secp256k1_ecdh.restype = c_int
+        except (OSError, AttributeError):
+            _logger.warning("libsecp256k1 library found but it was built without desired module (--enable-module-ecdh)")
+            HAS_ECDH = False
+
         secp256k1.ctx = secp256k1.secp256k1_context_create(SECP256K1_CONTEXT_SIGN | SECP256K1_CONTEXT_VERIFY)
         ret = secp256k1.secp256k1_context_randomize(secp256k1.ctx, os.urandom(32))
         if not ret:
@@ -177,6 +185,7 @@ def load_library():
 
 _libsecp256k1 = None
 HAS_SCHNORR = True
+HAS_ECDH = True
 try:
     _libsecp256k1 = load_library()
 except BaseException as e:
@@ -58,7 +58,7 @@ from .lnutil import (Outpoint, LocalConfig, RemoteConfig, Keypair, OnlyPubkeyKey
 from .lnsweep import create_sweeptxs_for_our_ctx, create_sweeptxs_for_their_ctx
 from .lnsweep import create_sweeptx_for_their_revoked_htlc, SweepInfo
 from .lnhtlc import HTLCManager
-from .lnmsg import encode_msg, decode_msg
+from .lnmsg import encode_msg
 from .address_synchronizer import TX_HEIGHT_LOCAL
 from .lnutil import CHANNEL_OPENING_TIMEOUT
 from .lnutil import ChannelBackupStorage, ImportedChannelBackupStorage, OnchainChannelBackupStorage
@@ -785,8 +785,8 @@ class Channel(AbstractChannel):
             raise Exception('lnworker not set for channel!')
         if scid is None:
             scid = self.short_channel_id
-        sorted_node_ids = list(sorted([self.node_id, self.get_local_pubkey()]))
-        channel_flags = b'\x00' if sorted_node_ids[0] == self.get_local_pubkey() else b'\x01'
+        # direction bit: 0 if we are node_id_1, i.e. the lexicographically lesser node id
+        channel_flags = b'\x00' if self.get_local_pubkey() < self.node_id else b'\x01'
         htlc_maximum_msat = min(self.config[REMOTE].max_htlc_value_in_flight_msat, 1000 * self.constraints.capacity)
 
         chan_upd = encode_msg(
@@ -804,9 +804,7 @@ class Channel(AbstractChannel):
         )
         sighash = sha256d(chan_upd[2 + 64:])
         sig = ecc.ECPrivkey(self.lnworker.node_keypair.privkey).ecdsa_sign(sighash, sigencode=ecc.ecdsa_sig64_from_r_and_s)
-        message_type, payload = decode_msg(chan_upd)
-        payload['signature'] = sig
-        chan_upd = encode_msg(message_type, **payload)
+        chan_upd = chan_upd[:2] + sig + chan_upd[2 + 64:]  # signature is the first field
 
         self._outgoing_channel_update = chan_upd
         return chan_upd
@@ -1143,10 +1141,13 @@ class Channel(AbstractChannel):
                                                                   ctn=next_local_ctn)
         if len(htlc_to_ctx_output_idx_map) != len(htlc_sigs):
             raise LNProtocolWarning(f'htlc sigs failure. recv {len(htlc_sigs)} sigs, expected {len(htlc_to_ctx_output_idx_map)}')
+        # all htlc txs of this ctx are signed with the same key, derive it only once
+        remote_htlc_pubkey = derive_pubkey(self.config[REMOTE].htlc_basepoint.pubkey, pcp) if htlc_sigs else None
         for (direction, htlc), (ctx_output_idx, htlc_relative_idx) in htlc_to_ctx_output_idx_map.items():
             htlc_sig = htlc_sigs[htlc_relative_idx]
             self._verify_htlc_sig(htlc=htlc,
                                   htlc_sig=htlc_sig,
+                                  remote_htlc_pubkey=remote_htlc_pubkey,
                                   htlc_direction=direction,
                                   pcp=pcp,
                                   ctx=pending_local_commitment,
@@ -1157,8 +1158,9 @@ class Channel(AbstractChannel):
             self.config[LOCAL].current_commitment_signature=sig
             self.config[LOCAL].current_htlc_signatures=htlc_sigs_string
 
-    def _verify_htlc_sig(self, *, htlc: UpdateAddHtlc, htlc_sig: bytes, htlc_direction: Direction,
-                         pcp: bytes, ctx: Transaction, ctx_output_idx: int, ctn: int) -> None:
+    def _verify_htlc_sig(self, *, htlc: UpdateAddHtlc, htlc_sig: bytes, remote_htlc_pubkey: bytes,
+                         htlc_direction: Direction, pcp: bytes, ctx: Transaction, ctx_output_idx: int,
+                         ctn: int) -> None:
         _script, htlc_tx = make_htlc_tx_with_open_channel(chan=self,
                                                           pcp=pcp,
                                                           subject=LOCAL,
@@ -1169,7 +1171,6 @@ class Channel(AbstractChannel):
                                                           htlc=htlc)
         pre_hash = htlc_tx.serialize_preimage(0)
         msg_hash = sha256d(pre_hash)
-        remote_htlc_pubkey = derive_pubkey(self.config[REMOTE].htlc_basepoint.pubkey, pcp)
         if not ECPubkey(remote_htlc_pubkey).ecdsa_verify(htlc_sig, msg_hash):
             raise LNProtocolWarning(
                 f'failed verifying HTLC signatures: {htlc=}, {htlc_direction=}. '
@@ -1,6 +1,7 @@
 import os
 import csv
 import io
+import struct
 from typing import Callable, Tuple, Any, Dict, List, Sequence, Union, Optional
 from collections import OrderedDict
 
@@ -40,16 +41,55 @@ def _assert_can_read_at_least_n_bytes(fd: io.BytesIO, n: int) -> None:
         raise UnexpectedEndOfStream(f"wants to read {n} bytes but only {nremaining} bytes left")
 
 
+# byte length of field types that have a fixed size
+_FIELD_TYPE_LEN = {
+    'byte': 1,
+    'u8': 1,
+    'u16': 2,
+    'u32': 4,
+    'u64': 8,
+    'chain_hash': 32,
+    'channel_id': 32,
+    'sha256': 32,
+    'signature': 64,
+    'point': 33,
+    'short_channel_id': 8,
+}  # type: Dict[str, int]
+
+_INT_FIELD_STRUCTS = {
+    'u8': struct.Struct('>B'),
+    'u16': struct.Struct('>H'),
+    'u32': struct.Struct('>I'),
+    'u64': struct.Struct('>Q'),
+}  # type: Dict[str, struct.Struct]
+
+
+def _pack_int_field(int_struct: struct.Struct, value: int) -> bytes:
+    try:
+        return int_struct.pack(value)
+    except struct.error as e:
+        # same exception as int.to_bytes, for negative or too large values
+        raise OverflowError(f"int {value!r} does not fit field: {e}") from e
+
+
+# max byte length of truncated ints (leading zero bytes are omitted on the wire)
+_TRUNCATED_INT_FIELD_LEN = {
+    'tu16': 2,
+    'tu32': 4,
+    'tu64': 8,
+}  # type: Dict[str, int]
+
+
 def write_bigsize_int(i: int) -> bytes:
     assert i >= 0, i
     if i < 0xfd:
-        return int.to_bytes(i, length=1, byteorder="big", signed=False)
+        return _pack_int_field(_INT_FIELD_STRUCTS['u8'], i)
     elif i < 0x1_0000:
-        return b"\xfd" + int.to_bytes(i, length=2, byteorder="big", signed=False)
+        return b"\xfd" + _pack_int_field(_INT_FIELD_STRUCTS['u16'], i)
     elif i < 0x1_0000_0000:
-        return b"\xfe" + int.to_bytes(i, length=4, byteorder="big", signed=False)
+        return b"\xfe" + _pack_int_field(_INT_FIELD_STRUCTS['u32'], i)
     else:
-        return b"\xff" + int.to_bytes(i, length=8, byteorder="big", signed=False)
+        return b"\xff" + _pack_int_field(_INT_FIELD_STRUCTS['u64'], i)
 
 
 def read_bigsize_int(fd: io.BytesIO) -> Optional[int]:
@@ -63,7 +103,7 @@ def read_bigsize_int(fd: io.BytesIO) -> Optional[int]:
         buf = fd.read(2)
         if len(buf) != 2:
             raise UnexpectedEndOfStream()
-        val = int.from_bytes(buf, byteorder="big", signed=False)
+        val, = _INT_FIELD_STRUCTS['u16'].unpack(buf)
         if not (0xfd <= val < 0x1_0000):
             raise FieldEncodingNotMinimal()
         return val
@@ -71,7 +111,7 @@ def read_bigsize_int(fd: io.BytesIO) -> Optional[int]:
         buf = fd.read(4)
         if len(buf) != 4:
             raise UnexpectedEndOfStream()
-        val = int.from_bytes(buf, byteorder="big", signed=False)
+        val, = _INT_FIELD_STRUCTS['u32'].unpack(buf)
         if not (0x1_0000 <= val < 0x1_0000_0000):
             raise FieldEncodingNotMinimal()
         return val
@@ -79,7 +119,7 @@ def read_bigsize_int(fd: io.BytesIO) -> Optional[int]:
         buf = fd.read(8)
         if len(buf) != 8:
             raise UnexpectedEndOfStream()
-        val = int.from_bytes(buf, byteorder="big", signed=False)
+        val, = _INT_FIELD_STRUCTS['u64'].unpack(buf)
         if not (0x1_0000_0000 <= val):
             raise FieldEncodingNotMinimal()
         return val
@@ -98,32 +138,15 @@ def _read_field(*, fd: io.BytesIO, field_type: str, count: Union[int, str]) -> U
         raise Exception(f"unexpected field count: {count!r}")
     if count == 0:
         return b""
-    type_len = None
-    if field_type == 'byte':
-        type_len = 1
-    elif field_type in ('u8', 'u16', 'u32', 'u64'):
-        if field_type == 'u8':
-            type_len = 1
-        elif field_type == 'u16':
-            type_len = 2
-        elif field_type == 'u32':
-            type_len = 4
-        else:
-            assert field_type == 'u64'
-            type_len = 8
+    int_struct = _INT_FIELD_STRUCTS.get(field_type)
+    if int_struct is not None:
         assert count == 1, count
-        buf = fd.read(type_len)
-        if len(buf) != type_len:
+        buf = fd.read(int_struct.size)
+        if len(buf) != int_struct.size:
             raise UnexpectedEndOfStream()
-        return int.from_bytes(buf, byteorder="big", signed=False)
-    elif field_type in ('tu16', 'tu32', 'tu64'):
-        if field_type == 'tu16':
-            type_len = 2
-        elif field_type == 'tu32':
-            type_len = 4
-        else:
-            assert field_type == 'tu64'
-            type_len = 8
+        return int_struct.unpack(buf)[0]
+    elif field_type in _TRUNCATED_INT_FIELD_LEN:
+        type_len = _TRUNCATED_INT_FIELD_LEN[field_type]
         assert count == 1, count
         raw = fd.read(type_len)
         if len(raw) > 0 and raw[0] == 0x00:
@@ -135,18 +158,7 @@ def _read_field(*, fd: io.BytesIO, field_type: str, count: Union[int, str]) -> U
         if val is None:
             raise UnexpectedEndOfStream()
         return val
-    elif field_type == 'chain_hash':
-        type_len = 32
-    elif field_type == 'channel_id':
-        type_len = 32
-    elif field_type == 'sha256':
-        type_len = 32
-    elif field_type == 'signature':
-        type_len = 64
-    elif field_type == 'point':
-        type_len = 33
-    elif field_type == 'short_channel_id':
-        type_len = 8
+    type_len = _FIELD_TYPE_LEN.get(field_type)
 
     if count == "...":
         total_len = -1  # read all
@@ -173,25 +185,8 @@ def _write_field(*, fd: io.BytesIO, field_type: str, count: Union[int, str],
         raise Exception(f"unexpected field count: {count!r}")
     if count == 0:
         return
-    type_len = None
-    if field_type == 'byte':
-        type_len = 1
-    elif field_type == 'u8':
-        type_len = 1
-    elif field_type == 'u16':
-        type_len = 2
-    elif field_type == 'u32':
-        type_len = 4
-    elif field_type == 'u64':
-        type_len = 8
-    elif field_type in ('tu16', 'tu32', 'tu64'):
-        if field_type == 'tu16':
-            type_len = 2
-        elif field_type == 'tu32':
-            type_len = 4
-        else:
-            assert field_type == 'tu64'
-            type_len = 8
+    if field_type in _TRUNCATED_INT_FIELD_LEN:
+        type_len = _TRUNCATED_INT_FIELD_LEN[field_type]
         assert count == 1, count
         if isinstance(value, int):
             value = int.to_bytes(value, length=type_len, byteorder="big", signed=False)
@@ -213,18 +208,10 @@ def _write_field(*, fd: io.BytesIO, field_type: str, count: Union[int, str],
         if nbytes_written != len(value):
             raise Exception(f"tried to write {len(value)} bytes, but only wrote {nbytes_written}!?")
         return
-    elif field_type == 'chain_hash':
-        type_len = 32
-    elif field_type == 'channel_id':
-        type_len = 32
-    elif field_type == 'sha256':
-        type_len = 32
-    elif field_type == 'signature':
-        type_len = 64
-    elif field_type == 'point':
-        type_len = 33
-    elif field_type == 'short_channel_id':
-        type_len = 8
+    int_struct = _INT_FIELD_STRUCTS.get(field_type)
+    if int_struct is not None and count == 1 and isinstance(value, int):
+        value = _pack_int_field(int_struct, value)
+    type_len = _FIELD_TYPE_LEN.get(field_type)
     total_len = -1
     if count != "...":
         if type_len is None:
@@ -278,6 +265,19 @@ def _resolve_field_count(field_count_str: str, *, vars_dict: dict, allow_any=Fal
     return field_count
 
 
+def _parse_field_count_str(field_count_str: str) -> Union[int, str]:
+    """Pre-resolves a field count that does not depend on other fields.
+    Returns an int, or the (unchanged) str if the count can only be resolved
+    when encoding/decoding a message.
+    """
+    if field_count_str == "":
+        return 1
+    try:
+        return int(field_count_str)
+    except ValueError:
+        return field_count_str
+
+
 def _parse_msgtype_intvalue_for_onion_wire(value: str) -> int:
     msg_type_int = 0
     for component in value.split("|"):
@@ -294,6 +294,8 @@ class LNSerializer:
         # TODO msg_type could be 'int' everywhere...
         self.msg_scheme_from_type = {}  # type: Dict[bytes, List[Sequence[str]]]
         self.msg_type_from_name = {}  # type: Dict[str, bytes]
+        # precomputed from msg_scheme_from_type: (field_name, field_type, field_count, type_len) per msgdata row
+        self.msg_fields_from_type = {}  # type: Dict[bytes, Sequence[Tuple[str, str, Union[int, str], Optional[int]]]]
 
         self.in_tlv_stream_get_tlv_record_scheme_from_type = {}  # type: Dict[str, Dict[int, List[Sequence[str]]]]
         self.in_tlv_stream_get_record_type_from_name = {}  # type: Dict[str, Dict[str, int]]
@@ -350,6 +352,10 @@ class LNSerializer:
                     self.in_tlv_stream_get_tlv_record_scheme_from_type[tlv_stream_name][tlv_record_type].append(tuple(row))
                 else:
                     pass  # TODO
+        for msg_type_bytes, scheme in self.msg_scheme_from_type.items():
+            self.msg_fields_from_type[msg_type_bytes] = tuple(
+                (row[2], row[3], _parse_field_count_str(row[4]), _FIELD_TYPE_LEN.get(row[3]))
+                for row in scheme[1:])
 
     def write_tlv_stream(self, *, fd: io.BytesIO, tlv_stream_name: str, **kwargs) -> None:
         scheme_map = self.in_tlv_stream_get_tlv_record_scheme_from_type[tlv_stream_name]
@@ -433,37 +439,41 @@ class LNSerializer:
         """
         #print(f">>> encode_msg. msg_type={msg_type}, payload={kwargs!r}")
         msg_type_bytes = self.msg_type_from_name[msg_type]
-        scheme = self.msg_scheme_from_type[msg_type_bytes]
-        with io.BytesIO() as fd:
-            fd.write(msg_type_bytes)
-            for row in scheme:
-                if row[0] == "msgtype":
-                    pass
-                elif row[0] == "msgdata":
-                    # msgdata,<msgname>,<fieldname>,<typename>,[<count>][,<option>]
-                    field_name = row[2]
-                    field_type = row[3]
-                    field_count_str = row[4]
-                    #print(f">>> encode_msg. msgdata. field_name={field_name!r}. field_type={field_type!r}. field_count_str={field_count_str!r}")
-                    field_count = _resolve_field_count(field_count_str, vars_dict=kwargs)
-                    if field_name == "tlvs":
-                        tlv_stream_name = field_type
-                        if tlv_stream_name in kwargs:
-                            self.write_tlv_stream(fd=fd, tlv_stream_name=tlv_stream_name, **(kwargs[tlv_stream_name]))
-                        continue
-                    try:
-                        field_value = kwargs[field_name]
-                    except KeyError:
-                        field_value = 0  # default mandatory fields to zero
-                    #print(f">>> encode_msg. writing field: {field_name}. value={field_value!r}. field_type={field_type!r}. count={field_count!r}")
-                    _write_field(fd=fd,
-                                 field_type=field_type,
-                                 count=field_count,
-                                 value=field_value)
-                    #print(f">>> encode_msg. so far: {fd.getvalue().hex()}")
-                else:
-                    raise Exception(f"unexpected row in scheme: {row!r}")
-            return fd.getvalue()
+        buf = bytearray(msg_type_bytes)
+        for field_name, field_type, field_count, type_len in self.msg_fields_from_type[msg_type_bytes]:
+            if isinstance(field_count, str):
+                field_count = _resolve_field_count(field_count, vars_dict=kwargs)
+            if field_name == "tlvs":
+                tlv_stream_name = field_type
+                if tlv_stream_name in kwargs:
+                    with io.BytesIO() as fd:
+                        self.write_tlv_stream(fd=fd, tlv_stream_name=tlv_stream_name, **(kwargs[tlv_stream_name]))
+                        buf += fd.getvalue()
+                continue
+            try:
+                field_value = kwargs[field_name]
+            except KeyError:
+                field_value = 0  # default mandatory fields to zero
+            if type_len is None:
+                # no fixed size (or unknown type): go through the generic writer
+                with io.BytesIO() as fd:
+                    _write_field(fd=fd, field_type=field_type, count=field_count, value=field_value)
+                    buf += fd.getvalue()
+                continue
+            if field_count == 0:
+                continue
+            if field_count == 1 and isinstance(field_value, int) and field_type in _INT_FIELD_STRUCTS:
+                buf += _pack_int_field(_INT_FIELD_STRUCTS[field_type], field_value)
+                continue
+            total_len = field_count * type_len
+            if isinstance(field_value, int) and (field_count == 1 or field_type == 'byte'):
+                field_value = int.to_bytes(field_value, length=total_len, byteorder="big", signed=False)
+            if not isinstance(field_value, (bytes, bytearray)):
+                raise Exception(f"can only write bytes into fd. got: {field_value!r}")
+            if total_len != len(field_value):
+                raise UnexpectedFieldSizeForEncoder(f"expected: {total_len}, got {len(field_value)}")
+            buf += field_value
+        return bytes(buf)
 
     def decode_msg(self, data: bytes) -> Tuple[str, dict]:
         """
@@ -487,29 +497,35 @@ class LNSerializer:
         assert scheme[0][2] == msg_type_int
         msg_type_name = scheme[0][1]
         parsed = {}
+        pos = 2
+        end = len(data)
         try:
-            with io.BytesIO(data[2:]) as fd:
-                for row in scheme:
-                    #print(f"row: {row!r}")
-                    if row[0] == "msgtype":
-                        pass
-                    elif row[0] == "msgdata":
-                        field_name = row[2]
-                        field_type = row[3]
-                        field_count_str = row[4]
-                        field_count = _resolve_field_count(field_count_str, vars_dict=parsed)
-                        if field_name == "tlvs":
-                            tlv_stream_name = field_type
-                            d = self.read_tlv_stream(fd=fd, tlv_stream_name=tlv_stream_name)
-                            parsed[tlv_stream_name] = d
-                            continue
-                        #print(f">> count={field_count}. parsed={parsed}")
-                        parsed[field_name] = _read_field(
-                            fd=fd,
-                            field_type=field_type,
-                            count=field_count)
-                    else:
-                        raise Exception(f"unexpected row in scheme: {row!r}")
+            for field_name, field_type, field_count, type_len in self.msg_fields_from_type[msg_type_bytes]:
+                if isinstance(field_count, str):
+                    field_count = _resolve_field_count(field_count, vars_dict=parsed)
+                if field_name == "tlvs":
+                    tlv_stream_name = field_type
+                    with io.BytesIO(data[pos:]) as fd:
+                        d = self.read_tlv_stream(fd=fd, tlv_stream_name=tlv_stream_name)
+                    parsed[tlv_stream_name] = d
+                    pos = end
+                    continue
+                if type_len is None:
+                    # no fixed size (or unknown type): go through the generic reader
+                    with io.BytesIO(data[pos:]) as fd:
+                        parsed[field_name] = _read_field(fd=fd, field_type=field_type, count=field_count)
+                        pos += fd.tell()
+                    continue
+                total_len = field_count * type_len
+                if pos + total_len > end:
+                    raise UnexpectedEndOfStream()
+                int_struct = _INT_FIELD_STRUCTS.get(field_type)
+                if int_struct is not None and field_count != 0:
+                    assert field_count == 1, field_count
+                    parsed[field_name] = int_struct.unpack_from(data, pos)[0]
+                else:
+                    parsed[field_name] = data[pos:pos + total_len]
+                pos += total_len
         except FailedToParseMsg as e:
             e.msg_type_int = msg_type_int
             e.msg_type_name = msg_type_name
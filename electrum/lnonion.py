@@ -194,11 +194,10 @@ def new_onion_packet(
         rho_key = get_bolt04_onion_key(b'rho', hop_shared_secrets[i])
         mu_key = get_bolt04_onion_key(b'mu', hop_shared_secrets[i])
         hops_data[i].hmac = next_hmac
-        stream_bytes = generate_cipher_stream(rho_key, data_size)
         hop_data_bytes = hops_data[i].to_bytes()
         mix_header = mix_header[:-len(hop_data_bytes)]
         mix_header = hop_data_bytes + mix_header
-        mix_header = xor_bytes(mix_header, stream_bytes)
+        mix_header = apply_cipher_stream(rho_key, mix_header)
         if i == num_hops - 1 and len(filler) != 0:
             mix_header = mix_header[:-len(filler)] + filler
         packet = mix_header + associated_data
@@ -259,25 +258,24 @@ def _generate_filler(key_type: bytes, hops_data: Sequence[OnionHopsDataSingle],
     num_hops = len(hops_data)
 
     # generate filler that matches all but the last hop (no HMAC for last hop)
-    filler_size = 0
-    for hop_data in hops_data[:-1]:
-        filler_size += len(hop_data.to_bytes())
+    # note: the serialized length of a hop does not depend on its hmac, so encode each once
+    hop_sizes = [len(hop_data.to_bytes()) for hop_data in hops_data]
+    filler_size = sum(hop_sizes[:-1])
     filler = bytearray(filler_size)
 
+    # Sum up how many frames were used by prior hops.
+    filler_start = data_size
     for i in range(0, num_hops-1):  # -1, as last hop does not obfuscate
-        # Sum up how many frames were used by prior hops.
-        filler_start = data_size
-        for hop_data in hops_data[:i]:
-            filler_start -= len(hop_data.to_bytes())
         # The filler is the part dangling off of the end of the
         # routingInfo, so offset it from there, and use the current
         # hop's frame count as its size.
-        filler_end = data_size + len(hops_data[i].to_bytes())
+        filler_end = data_size + hop_sizes[i]
 
         stream_key = get_bolt04_onion_key(key_type, shared_secrets[i])
         stream_bytes = generate_cipher_stream(stream_key, 2 * data_size)
         filler = xor_bytes(filler, stream_bytes[filler_start:filler_end])
         filler += bytes(filler_size - len(filler))  # right pad with zeroes
+        filler_start -= hop_sizes[i]
 
     return filler
 
@@ -288,6 +286,15 @@ def generate_cipher_stream(stream_key: bytes, num_bytes: int) -> bytes:
                             data=bytes(num_bytes))
 
 
+def apply_cipher_stream(stream_key: bytes, data: bytes) -> bytes:
+    """Returns data XOR generate_cipher_stream(stream_key, len(data)),
+    computed by the cipher directly instead of materializing the stream.
+    """
+    return chacha20_encrypt(key=stream_key,
+                            nonce=bytes(8),
+                            data=data)
+
+
 class ProcessedOnionPacket(NamedTuple):
     are_we_final: bool
     hop_data: OnionHopsDataSingle
@@ -314,9 +321,8 @@ def process_onion_packet(
     # peel an onion layer off
     rho_key = get_bolt04_onion_key(b'rho', shared_secret)
     data_size = TRAMPOLINE_HOPS_DATA_SIZE if is_trampoline else HOPS_DATA_SIZE
-    stream_bytes = generate_cipher_stream(rho_key, 2 * data_size)
     padded_header = onion_packet.hops_data + bytes(data_size)
-    next_hops_data = xor_bytes(padded_header, stream_bytes)
+    next_hops_data = apply_cipher_stream(rho_key, padded_header)
     next_hops_data_fd = io.BytesIO(next_hops_data)
     hop_data = OnionHopsDataSingle.from_fd(next_hops_data_fd)
     # trampoline
@@ -413,8 +419,7 @@ def construct_onion_error(
 def obfuscate_onion_error(error_packet, their_public_key, our_onion_private_key):
     shared_secret = get_ecdh(our_onion_private_key, their_public_key)
     ammag_key = get_bolt04_onion_key(b'ammag', shared_secret)
-    stream_bytes = generate_cipher_stream(ammag_key, len(error_packet))
-    error_packet = xor_bytes(error_packet, stream_bytes)
+    error_packet = apply_cipher_stream(ammag_key, error_packet)
     return error_packet
 
 
@@ -426,8 +431,7 @@ def _decode_onion_error(error_packet: bytes, payment_path_pubkeys: Sequence[byte
     for i in range(num_hops):
         ammag_key = get_bolt04_onion_key(b'ammag', hop_shared_secrets[i])
         um_key = get_bolt04_onion_key(b'um', hop_shared_secrets[i])
-        stream_bytes = generate_cipher_stream(ammag_key, len(error_packet))
-        error_packet = xor_bytes(error_packet, stream_bytes)
+        error_packet = apply_cipher_stream(ammag_key, error_packet)
         hmac_computed = hmac_oneshot(um_key, msg=error_packet[32:], digest=hashlib.sha256)
         hmac_found = error_packet[:32]
         if hmac_computed == hmac_found:
@@ -39,7 +39,7 @@ from .lnutil import (Outpoint, LocalConfig, RECEIVED, UpdateAddHtlc, ChannelConf
                      funding_output_script, get_per_commitment_secret_from_seed,
                      secret_to_pubkey, PaymentFailure, LnFeatures,
                      LOCAL, REMOTE, HTLCOwner,
-                     ln_compare_features, privkey_to_pubkey, MIN_FINAL_CLTV_DELTA_ACCEPTED,
+                     ln_compare_features, MIN_FINAL_CLTV_DELTA_ACCEPTED,
                      LightningPeerConnectionClosed, HandshakeFailed,
                      RemoteMisbehaving, ShortChannelID,
                      IncompatibleLightningFeatures, derive_payment_secret_from_payment_preimage,
@@ -97,7 +97,7 @@ class Peer(Logger):
         self.privkey = self.transport.privkey  # local privkey
         self.features = self.lnworker.features  # type: LnFeatures
         self.their_features = LnFeatures(0)  # type: LnFeatures
-        self.node_ids = [self.pubkey, privkey_to_pubkey(self.privkey)]
+        self.node_ids = [self.pubkey, self.transport.local_pubkey]
         assert self.node_ids[0] != self.node_ids[1]
         self.last_message_time = 0
         self.pong_event = asyncio.Event()
@@ -122,6 +122,11 @@ class Peer(Logger):
         self._received_revack_event = asyncio.Event()
         self.received_commitsig_event = asyncio.Event()
         self.downstream_htlc_resolved_event = asyncio.Event()
+        # message_type -> bound 'on_<message_type>' handler, see _process_message
+        self._message_handlers = {
+            name[3:]: getattr(self, name)
+            for name in dir(type(self)) if name.startswith('on_')
+        }  # type: Dict[str, Callable]
 
     def send_message(self, message_name: str, **kwargs):
         assert util.get_running_loop() == util.get_asyncio_loop(), f"this must be run on the asyncio thread!"
@@ -177,6 +182,11 @@ class Peer(Logger):
         self._sent_init = True
         self.maybe_set_initialized()
 
+    @functools.cached_property
+    def _node_ecprivkey(self) -> ecc.ECPrivkey:
+        # local node key, for signing gossip
+        return ecc.ECPrivkey(self.privkey)
+
     @property
     def channels(self) -> Dict[bytes, Channel]:
         return self.lnworker.channels_for_peer(self.pubkey)
@@ -229,9 +239,8 @@ class Peer(Logger):
                 args = (chan, payload)
             else:
                 args = (payload,)
-            try:
-                f = getattr(self, 'on_' + message_type)
-            except AttributeError:
+            f = self._message_handlers.get(message_type)
+            if f is None:
                 #self.logger.info("Received '%s'" % message_type.upper(), payload)
                 return
             # raw message is needed to check signature
@@ -466,8 +475,8 @@ class Peer(Logger):
             chan_anns = []
             chan_upds = []
             node_anns = []
+            name, payload = await self.gossip_queue.get()
             while True:
-                name, payload = await self.gossip_queue.get()
                 if name == 'channel_announcement':
                     chan_anns.append(payload)
                 elif name == 'channel_update':
@@ -476,7 +485,11 @@ class Peer(Logger):
                     node_anns.append(payload)
                 else:
                     raise Exception('unknown message')
-                if self.gossip_queue.empty():
+                # drain the rest of the backlog with get_nowait(); awaiting get() on a non-empty
+                # queue would not suspend either, but creates a coroutine per item
+                try:
+                    name, payload = self.gossip_queue.get_nowait()
+                except asyncio.QueueEmpty:
                     break
             if self.network.lngossip:
                 await self.network.lngossip.process_gossip(chan_anns, node_anns, chan_upds)
@@ -814,7 +827,11 @@ class Peer(Logger):
         )
 
         # <- accept_channel
-        payload = await self.wait_for_message('accept_channel', temp_channel_id)
+        try:
+            payload = await self.wait_for_message('accept_channel', temp_channel_id)
+        finally:
+            # no more ordered messages are expected for the temporary channel id
+            self.ordered_message_queues.pop(temp_channel_id, None)
         self.logger.debug(f"received accept_channel for temp_channel_id={temp_channel_id.hex()}. {payload=}")
         remote_per_commitment_point = payload['first_per_commitment_point']
         funding_txn_minimum_depth = payload['minimum_depth']
@@ -1081,7 +1098,11 @@ class Peer(Logger):
         )
 
         # <- funding created
-        funding_created = await self.wait_for_message('funding_created', temp_chan_id)
+        try:
+            funding_created = await self.wait_for_message('funding_created', temp_chan_id)
+        finally:
+            # no more ordered messages are expected for the temporary channel id
+            self.ordered_message_queues.pop(temp_chan_id, None)
 
         # -> funding signed
         funding_idx = funding_created['funding_output_index']
@@ -1434,7 +1455,7 @@ class Peer(Logger):
 
     def send_node_announcement(self, alias:str):
         timestamp = int(time.time())
-        node_id = privkey_to_pubkey(self.privkey)
+        node_id = self.node_ids[1]
         features = self.features.for_node_announcement()
         b = int.bit_length(features)
         flen = b // 8 + int(bool(b % 8))
@@ -1453,10 +1474,8 @@ class Peer(Logger):
             addrlen=len(addresses),
             addresses=addresses)
         h = sha256d(raw_msg[64+2:])
-        signature = ecc.ECPrivkey(self.privkey).ecdsa_sign(h, sigencode=ecdsa_sig64_from_r_and_s)
-        message_type, payload = decode_msg(raw_msg)
-        payload['signature'] = signature
-        raw_msg = encode_msg(message_type, **payload)
+        signature = self._node_ecprivkey.ecdsa_sign(h, sigencode=ecdsa_sig64_from_r_and_s)
+        raw_msg = raw_msg[:2] + signature + raw_msg[2 + 64:]  # signature is the first field
         self.transport.send_bytes(raw_msg)
 
     def maybe_send_channel_announcement(self, chan: Channel):
@@ -1517,7 +1536,7 @@ class Peer(Logger):
             return
         h = chan.get_channel_announcement_hash()
         bitcoin_signature = ecc.ECPrivkey(chan.config[LOCAL].multisig_key.privkey).ecdsa_sign(h, sigencode=ecdsa_sig64_from_r_and_s)
-        node_signature = ecc.ECPrivkey(self.privkey).ecdsa_sign(h, sigencode=ecdsa_sig64_from_r_and_s)
+        node_signature = self._node_ecprivkey.ecdsa_sign(h, sigencode=ecdsa_sig64_from_r_and_s)
         self.send_message(
             "announcement_signatures",
             channel_id=chan.channel_id,
@@ -7,11 +7,13 @@
 
 import hashlib
 import asyncio
+import struct
 from asyncio import StreamReader, StreamWriter
 from typing import Optional
 from functools import cached_property
 
-from .crypto import sha256, hmac_oneshot, chacha20_poly1305_encrypt, chacha20_poly1305_decrypt
+from .crypto import (sha256, hkdf_sha256, chacha20_poly1305_encrypt, chacha20_poly1305_decrypt,
+                     ChaCha20Poly1305)
 from .lnutil import (get_ecdh, privkey_to_pubkey, LightningPeerConnectionClosed,
                      HandshakeFailed, LNPeerAddr)
 from . import ecc
@@ -31,14 +33,20 @@ class HandshakeState(object):
         self.update(self.responder_pub)
 
     def update(self, data):
-        self.h = sha256(self.h + data)
+        h = hashlib.sha256(self.h)
+        h.update(data)
+        self.h = h.digest()
         return self.h
 
+_NONCE_STRUCT = struct.Struct('<4xQ')
+_MSG_LEN_STRUCT = struct.Struct('>H')
+
+
 def get_nonce_bytes(n):
     """BOLT 8 requires the nonce to be 12 bytes, 4 bytes leading
     zeroes and 8 bytes little endian encoded 64 bit integer.
     """
-    return b"\x00"*4 + n.to_bytes(8, 'little')
+    return _NONCE_STRUCT.pack(n)
 
 def aead_encrypt(key: bytes, nonce: int, associated_data: bytes, data: bytes) -> bytes:
     nonce_bytes = get_nonce_bytes(nonce)
@@ -61,16 +69,9 @@ def get_bolt8_hkdf(salt, ikm):
     with info field set to a zero length string as per BOLT8
     Return as two 32 byte fields.
     """
-    #Extract
-    prk = hmac_oneshot(salt, msg=ikm, digest=hashlib.sha256)
-    assert len(prk) == 32
-    #Expand
-    info = b""
-    T0 = b""
-    T1 = hmac_oneshot(prk, T0 + info + b"\x01", digest=hashlib.sha256)
-    T2 = hmac_oneshot(prk, T1 + info + b"\x02", digest=hashlib.sha256)
-    assert len(T1 + T2) == 64
-    return T1, T2
+    okm = hkdf_sha256(salt=salt, ikm=ikm, info=b"", length=64)
+    assert len(okm) == 64
+    return okm[:32], okm[32:]
 
 def act1_initiator_message(hs, epriv, epub):
     ss = get_ecdh(epriv, hs.responder_pub)
@@ -106,52 +107,55 @@ class LNTransportBase:
         id_bytes = id_int.to_bytes((id_int.bit_length() + 7) // 8, byteorder='big')
         return sha256(id_bytes).hex()
 
+    @cached_property
+    def local_pubkey(self) -> bytes:
+        return privkey_to_pubkey(self.privkey)
+
     def send_bytes(self, msg: bytes) -> None:
-        l = len(msg).to_bytes(2, 'big')
-        lc = aead_encrypt(self.sk, self.sn(), b'', l)
-        c = aead_encrypt(self.sk, self.sn(), b'', msg)
+        if len(msg) > 0xffff:
+            # same error as the former len(msg).to_bytes(2, 'big'); checked before using up any nonces
+            raise OverflowError(f"message too long for a BOLT-08 frame: {len(msg)} bytes")
+        l = _MSG_LEN_STRUCT.pack(len(msg))
+        sn_l, aead_l = self.sn()
+        sn_m, aead_m = self.sn()
+        lc = aead_l.encrypt(nonce=get_nonce_bytes(sn_l), associated_data=b'', data=l)
+        c = aead_m.encrypt(nonce=get_nonce_bytes(sn_m), associated_data=b'', data=msg)
         assert len(lc) == 18
         assert len(c) == len(msg) + 16
         self.writer.write(lc+c)
 
+    async def _read_exactly(self, n: int) -> bytes:
+        try:
+            return await self.reader.readexactly(n)
+        except Exception:
+            raise LightningPeerConnectionClosed()
+
     async def read_messages(self):
-        buffer = bytearray()
         while True:
-            rn_l, rk_l = self.rn()
-            rn_m, rk_m = self.rn()
-            while True:
-                if len(buffer) >= 18:
-                    lc = bytes(buffer[:18])
-                    l = aead_decrypt(rk_l, rn_l, b'', lc)
-                    length = int.from_bytes(l, 'big')
-                    offset = 18 + length + 16
-                    if len(buffer) >= offset:
-                        c = bytes(buffer[18:offset])
-                        del buffer[:offset]  # much faster than: buffer=buffer[offset:]
-                        msg = aead_decrypt(rk_m, rn_m, b'', c)
-                        yield msg
-                        break
-                try:
-                    s = await self.reader.read(2**10)
-                except Exception:
-                    s = None
-                if not s:
-                    raise LightningPeerConnectionClosed()
-                buffer += s
+            rn_l, aead_l = self.rn()
+            rn_m, aead_m = self.rn()
+            lc = await self._read_exactly(18)
+            l = aead_l.decrypt(nonce=get_nonce_bytes(rn_l), associated_data=b'', data=lc)
+            length, = _MSG_LEN_STRUCT.unpack(l)
+            c = await self._read_exactly(length + 16)
+            msg = aead_m.decrypt(nonce=get_nonce_bytes(rn_m), associated_data=b'', data=c)
+            yield msg
 
     def rn(self):
-        o = self._rn, self.rk
+        o = self._rn, self._r_aead
         self._rn += 1
         if self._rn == 1000:
             self.r_ck, self.rk = get_bolt8_hkdf(self.r_ck, self.rk)
+            self._r_aead = ChaCha20Poly1305(self.rk)
             self._rn = 0
         return o
 
     def sn(self):
-        o = self._sn
+        o = self._sn, self._s_aead
         self._sn += 1
         if self._sn == 1000:
             self.s_ck, self.sk = get_bolt8_hkdf(self.s_ck, self.sk)
+            self._s_aead = ChaCha20Poly1305(self.sk)
             self._sn = 0
         return o
 
@@ -161,6 +165,9 @@ class LNTransportBase:
         self._rn = 0
         self.r_ck = ck
         self.s_ck = ck
+        # cipher objects for the current sk/rk, replaced on key rotation
+        self._s_aead = ChaCha20Poly1305(self.sk)
+        self._r_aead = ChaCha20Poly1305(self.rk)
 
     def close(self):
         self.writer.close()
@@ -183,7 +190,7 @@ class LNResponderTransport(LNTransportBase):
         return f"{super().name()}(in)"
 
     async def handshake(self, **kwargs):
-        hs = HandshakeState(privkey_to_pubkey(self.privkey))
+        hs = HandshakeState(self.local_pubkey)
         act1 = b''
         while len(act1) < 50:
             buf = await self.reader.read(50 - len(act1))
@@ -278,7 +285,7 @@ class LNTransport(LNTransportBase):
         p = aead_decrypt(temp_k2, 0, hs.h, tag)
         hs.update(tag)
         # act 3
-        my_pubkey = privkey_to_pubkey(self.privkey)
+        my_pubkey = self.local_pubkey
         c = aead_encrypt(temp_k2, 1, hs.h, my_pubkey)
         hs.update(c)
         ss = get_ecdh(self.privkey[:32], alice_epub)
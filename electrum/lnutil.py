@@ -9,6 +9,7 @@ from collections import namedtuple, defaultdict
 from typing import NamedTuple, List, Tuple, Mapping, Optional, TYPE_CHECKING, Union, Dict, Set, Sequence
 import re
 import sys
+import hashlib
 
 import attr
 from aiorpcx import NetAddress
@@ -21,7 +22,7 @@ from .util import format_short_id as format_short_channel_id
 from .crypto import sha256, pw_decode_with_version_and_mac
 from .transaction import (Transaction, PartialTransaction, PartialTxInput, TxOutpoint,
                           PartialTxOutput, opcodes, TxOutput)
-from .ecc import CURVE_ORDER, ecdsa_sig64_from_der_sig, ECPubkey, string_to_number
+from .ecc import CURVE_ORDER, ecdsa_sig64_from_der_sig
 from . import ecc, bitcoin, crypto, transaction
 from . import descriptor
 from .bitcoin import (redeem_script_to_address, address_to_script,
@@ -59,8 +60,13 @@ from .json_db import StoredObject, stored_in, stored_as
 
 def channel_id_from_funding_tx(funding_txid: str, funding_index: int) -> Tuple[bytes, bytes]:
     funding_txid_bytes = bytes.fromhex(funding_txid)[::-1]
-    i = int.from_bytes(funding_txid_bytes, 'big') ^ funding_index
-    return i.to_bytes(32, 'big'), funding_txid_bytes
+    if not (0 <= funding_index <= 0xffff):
+        raise ValueError(f"funding output index out of range: {funding_index}")
+    # funding_output_index is a u16, so it only affects the last two bytes
+    channel_id = bytearray(funding_txid_bytes)
+    channel_id[30] ^= funding_index >> 8
+    channel_id[31] ^= funding_index & 0xff
+    return bytes(channel_id), funding_txid_bytes
 
 hex_to_bytes = lambda v: v if isinstance(v, bytes) else bytes.fromhex(v) if v is not None else None
 bytes_to_hex = lambda v: repr(v.hex()) if v is not None else None
@@ -551,13 +557,14 @@ class ShachainElement(NamedTuple):
 def get_per_commitment_secret_from_seed(seed: bytes, i: int, bits: int = 48) -> bytes:
     """Generate per commitment secret."""
     per_commitment_secret = bytearray(seed)
-    for bitindex in range(bits - 1, -1, -1):
-        mask = 1 << bitindex
-        if i & mask:
-            per_commitment_secret[bitindex // 8] ^= 1 << (bitindex % 8)
-            per_commitment_secret = bytearray(sha256(per_commitment_secret))
-    bajts = bytes(per_commitment_secret)
-    return bajts
+    # only set bits cause a flip+hash; visit them from most to least significant
+    i &= (1 << bits) - 1
+    while i:
+        bitindex = i.bit_length() - 1
+        i ^= 1 << bitindex
+        per_commitment_secret[bitindex // 8] ^= 1 << (bitindex % 8)
+        per_commitment_secret = bytearray(hashlib.sha256(per_commitment_secret).digest())
+    return bytes(per_commitment_secret)
 
 def secret_to_pubkey(secret: int) -> bytes:
     assert type(secret) is int
@@ -1121,8 +1128,7 @@ def extract_ctn_from_tx_and_chan(tx: Transaction, chan: 'AbstractChannel') -> in
                                fundee_payment_basepoint=fundee_conf.payment_basepoint.pubkey)
 
 def get_ecdh(priv: bytes, pub: bytes) -> bytes:
-    pt = ECPubkey(pub) * string_to_number(priv)
-    return sha256(pt.get_public_key_bytes())
+    return ecc.ecdh_sha256(priv, pub)
 
 
 class LnFeatureContexts(enum.Flag):
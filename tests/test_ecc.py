@@ -140,3 +140,23 @@ class TestEcdsa(ElectrumTestCase):
             int.to_bytes(high_s, length=32, byteorder="big"))
         self.assertFalse(pubkey.ecdsa_verify(sig64_high_s, msg32))
         self.assertTrue(pubkey.ecdsa_verify(sig64_high_s, msg32, enforce_low_s=False))
+
+
+class TestEcdh(ElectrumTestCase):
+
+    def test_ecdh_sha256(self):
+        # test vector from BOLT-08 (act one, initiator)
+        epriv = bytes.fromhex("1212121212121212121212121212121212121212121212121212121212121212")
+        rs_pub = bytes.fromhex("028d7500dd4c12685d1f568b4c2b5048e8534b873319f3a8daa612b469132ec7f7")
+        self.assertEqual(bytes.fromhex("1e2fb3c8fe8fb9f262f649f64d26ecf0f2c0a805a767cf02dc2d77a6ef1fdcc3"),
+                         ecc.ecdh_sha256(epriv, rs_pub))
+        # the generic (point multiplication) code path must agree with libsecp256k1's ecdh module
+        has_ecdh = ecc.ecc_fast.HAS_ECDH
+        try:
+            ecc.ecc_fast.HAS_ECDH = False
+            self.assertEqual(bytes.fromhex("1e2fb3c8fe8fb9f262f649f64d26ecf0f2c0a805a767cf02dc2d77a6ef1fdcc3"),
+                             ecc.ecdh_sha256(epriv, rs_pub))
+        finally:
+            ecc.ecc_fast.HAS_ECDH = has_ecdh
+        with self.assertRaises(ecc.InvalidECPointException):
+            ecc.ecdh_sha256(epriv, bytes.fromhex("02" + "ff" * 32))
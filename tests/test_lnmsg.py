@@ -311,6 +311,23 @@ class TestLNMsg(ElectrumTestCase):
                           ),
                          decode_msg(bfh("008401010101010101010101010101010101010101010101010101010101010101014e206ecf904d9237b1c5b4e08513555e9a5932c45b5f68be8764ce998df635ae04f6ce7bbcd3b4fd08e2daab7f9059b287ecab4155367b834682633497173f450000")))
 
+    def test_decode_msg__truncated(self):
+        # commitment_signed with num_htlcs=1, but the htlc_signature is cut short
+        data = bfh("008401010101010101010101010101010101010101010101010101010101010101013b14af0c549dfb1fb287ff57c012371b3932996db5929eda5f251704751fb49d0dc2dcb88e5021575cb572fb71693758543f97d89e9165f913bfb7488d7cc26500012d31103b9f6e71131e4fee86fdfbdeba90e52b43fcfd11e8e53811cd4d59b2575ae6c3c82f85bea144c88cc35e568f1e6bdd0c57337e86de0b5da7cd9994")
+        with self.assertRaises(UnexpectedEndOfStream) as ctx:
+            decode_msg(data)
+        self.assertEqual("commitment_signed", ctx.exception.msg_type_name)
+        # cut inside a fixed-size field
+        with self.assertRaises(UnexpectedEndOfStream):
+            decode_msg(data[:40])
+
+    def test_encode_msg__int_out_of_range(self):
+        for num_pong_bytes in (0x1_0000, -1):
+            with self.assertRaises(OverflowError):
+                encode_msg("ping", num_pong_bytes=num_pong_bytes, byteslen=0)
+        with self.assertRaises(OverflowError):
+            write_bigsize_int(2**64)
+
     def test_encode_decode_msg__init(self):
         # "init" is interesting because it has TLVs optionally
         self.assertEqual(bfh("00100000000220c2"),
@@ -347,6 +347,7 @@ class PutIntoOthersQueueTransport(MockTransport):
         super().__init__(name)
         self.other_mock_transport = None
         self.privkey = keypair.privkey
+        self.local_pubkey = keypair.pubkey
 
     def send_bytes(self, data):
         self.other_mock_transport.queue.put_nowait(data)
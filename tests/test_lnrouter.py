@@ -14,6 +14,7 @@ from electrum.lnonion import (OnionHopsDataSingle, new_onion_packet,
 from electrum import bitcoin, lnrouter
 from electrum.constants import BitcoinTestnet
 from electrum.simple_config import SimpleConfig
+from electrum.channel_db import NodeInfo
 from electrum.lnrouter import PathEdge, LiquidityHintMgr, DEFAULT_PENALTY_PROPORTIONAL_MILLIONTH, DEFAULT_PENALTY_BASE_MSAT, fee_for_edge_msat
 
 from . import ElectrumTestCase
@@ -398,3 +399,20 @@ class Test_LNRouter(ElectrumTestCase):
         self.assertEqual(4, index_of_sender)
         self.assertEqual(OnionFailureCode.TEMPORARY_NODE_FAILURE, failure_msg.code)
         self.assertEqual(b'', failure_msg.data)
+
+    def test_parse_node_announcement_addresses_field(self):
+        addresses_field = (
+            bfh('01' '7f000001' '2607')  # IPv4
+            + bfh('00')  # padding
+            + bfh('02' '20010db8000000000000000000000001' '2607')  # IPv6
+            + bfh('01' '0a000001' '0000')  # port 0 is skipped
+            + bfh('04' + '00' * 35 + '2607')  # onion v3
+            + bfh('09' '7f000001' '2607')  # unknown type: stop parsing
+            + bfh('01' '0a000002' '2607')
+        )
+        self.assertEqual(
+            [('127.0.0.1', 9735), ('2001:0db8:0000:0000:0000:0000:0000:0001', 9735), ('a' * 56 + '.onion', 9735)],
+            NodeInfo.parse_addresses_field(addresses_field))
+        # truncated address
+        self.assertEqual([('127.0.0.1', 9735)],
+                         NodeInfo.parse_addresses_field(bfh('01' '7f000001' '2607' '02' '2001')))
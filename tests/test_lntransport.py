@@ -3,7 +3,7 @@ import asyncio
 from electrum import util
 from electrum.ecc import ECPrivkey
 from electrum.lnutil import LNPeerAddr
-from electrum.lntransport import LNResponderTransport, LNTransport
+from electrum.lntransport import LNResponderTransport, LNTransport, LNTransportBase
 from electrum.util import OldTaskGroup
 
 from . import ElectrumTestCase
@@ -41,6 +41,53 @@ class TestLNTransport(ElectrumTestCase):
         transport = LNResponderTransport(ls_priv, Reader(), Writer())
         await transport.handshake(epriv=e_priv)
 
+    @needs_test_with_all_chacha20_implementations
+    async def test_message_encryption_key_rotation(self):
+        # test vectors from BOLT-08, "Message Encryption Tests"
+        ck = bytes.fromhex('919219dbb2920afa8db80f9a51787a840bcf111ed8d588caf9ab4be716e42b01')
+        sk = bytes.fromhex('969ab31b4d288cedf6218839b27a3e2140827047f2c0f01bf5c04435d43511a9')
+        rk = bytes.fromhex('bb9020b8965f4df047e07f955f3c4b88418984aadc5cdb35096b9ea8fa5c3442')
+        expected_outputs = {
+            0: 'cf2b30ddf0cf3f80e7c35a6e6730b59fe802473180f396d88a8fb0db8cbcf25d2f214cf9ea1d95',
+            1: '72887022101f0b6753e0c7de21657d35a4cb2a1f5cde2650528bbc8f837d0f0d7ad833b1a256a1',
+            500: '178cb9d7387190fa34db9c2d50027d21793c9bc2d40b1e14dcf30ebeeeb220f48364f7a4c68bf8',
+            501: '1b186c57d44eb6de4c057c49940d79bb838a145cb528d6e8fd26dbe50a60ca2c104b56b60e45bd',
+            1000: '4a2f3cc3b5e78ddb83dcb426d9863d9d9a723b0337c89dd0b005d89f8d3c05c52b76b29b740f09',
+            1001: '2ecd8c8a5629d0d02ab457a0fdd0f7b90a192cd46be5ecb6ca570bfc5e268338b1a16cf4ef2d36',
+        }
+        num_msgs = 1002
+
+        class Writer:
+            def __init__(self):
+                self.outputs = []
+            def write(self, data):
+                self.outputs.append(data)
+        sender = LNTransportBase()
+        sender.writer = Writer()
+        sender.sk, sender.rk = sk, rk
+        sender.init_counters(ck)
+        for i in range(num_msgs):
+            sender.send_bytes(b'hello')
+            if i == 0:
+                # oversized messages are rejected without using up nonces
+                with self.assertRaises(OverflowError):
+                    sender.send_bytes(bytes(0x1_0000))
+        for idx, output in expected_outputs.items():
+            self.assertEqual(output, sender.writer.outputs[idx].hex())
+
+        # the other side must be able to decrypt all of them, across key rotations
+        receiver = LNTransportBase()
+        receiver.reader = asyncio.StreamReader()
+        receiver.reader.feed_data(b''.join(sender.writer.outputs))
+        receiver.sk, receiver.rk = rk, sk
+        receiver.init_counters(ck)
+        ctr = 0
+        async for msg in receiver.read_messages():
+            self.assertEqual(b'hello', msg)
+            ctr += 1
+            if ctr == num_msgs:
+                break
+
     @needs_test_with_all_chacha20_implementations
     async def test_loop(self):
         responder_shaked = asyncio.Event()
@@ -11,7 +11,7 @@ from electrum.lnutil import (RevocationStore, get_per_commitment_secret_from_see
                              get_compressed_pubkey_from_bech32, split_host_port, ConnStringFormatError,
                              ScriptHtlc, extract_nodeid, calc_fees_for_commitment_tx, UpdateAddHtlc, LnFeatures,
                              ln_compare_features, IncompatibleLightningFeatures, ChannelType,
-                             ImportedChannelBackupStorage)
+                             ImportedChannelBackupStorage, channel_id_from_funding_tx)
 from electrum.util import bfh, MyEncoder
 from electrum.transaction import Transaction, PartialTransaction, Sighash
 from electrum.lnworker import LNWallet
@@ -741,6 +741,17 @@ class TestLNUtil(ElectrumTestCase):
         self.assertEqual(b'\x03\x84\xef\x87\xd9d\xa2\xaaa7=\xff\xb8\xfe=t8[}>;\n\x13\xa8e\x8eo:\xf5Mi\xb5H',
                          get_compressed_pubkey_from_bech32('ln1qwzwlp7evj325cfh8hlm3l3awsu9klf78v9p82r93ehn4a2ddx65s66awg5'))
 
+    def test_channel_id_from_funding_tx(self):
+        funding_txid = "8984484a580b825b9972d7adb15050b3ab624ccd731946b3eeddb92f4e7ef6be"
+        self.assertEqual((bfh("bef67e4e2fb9ddeeb3461973cd4c62abb35050b1add772995b820b584a488489"), bfh("bef67e4e2fb9ddeeb3461973cd4c62abb35050b1add772995b820b584a488489")),
+                         channel_id_from_funding_tx(funding_txid, 0))
+        self.assertEqual(bfh("bef67e4e2fb9ddeeb3461973cd4c62abb35050b1add772995b820b584a488488"),
+                         channel_id_from_funding_tx(funding_txid, 1)[0])
+        self.assertEqual(bfh("bef67e4e2fb9ddeeb3461973cd4c62abb35050b1add772995b820b584a4896bd"),
+                         channel_id_from_funding_tx(funding_txid, 0x1234)[0])
+        with self.assertRaises(ValueError):
+            channel_id_from_funding_tx(funding_txid, 0x10000)
+
     def test_split_host_port(self):
         self.assertEqual(split_host_port("[::1]:8000"), ("::1", "8000"))
         self.assertEqual(split_host_port("[::1]"), ("::1", "9735"))